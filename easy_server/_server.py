@@ -18,6 +18,10 @@ from __future__ import absolute_import, print_function
 
 __all__ = ['Server']
 
+# Format string for Server.__repr__()
+_REPR_FMT = "Server(nickname=%r, description=%r, contact_name=%r, " \
+    "access_via=%r, user_defined=%r, secrets=%s)"
+
 
 class Server(object):
     """
@@ -48,6 +52,11 @@ class Server(object):
           password: mypass1
     """
 
+    # Servers are created in large numbers from a server file, so the instance
+    # dict is avoided.
+    __slots__ = ('_nickname', '_description', '_contact_name', '_access_via',
+                 '_user_defined', '_secrets')
+
     def __init__(self, nickname, server_dict, secrets_dict=None):
         """
         Parameters:
@@ -73,15 +82,10 @@ class Server(object):
         self._secrets = secrets_dict
 
     def __repr__(self):
-        secrets = "{...}" if self._secrets else "None"
-        return "Server(" \
-            "nickname={s._nickname!r}, " \
-            "description={s._description!r}, " \
-            "contact_name={s._contact_name!r}, " \
-            "access_via={s._access_via!r}, " \
-            "user_defined={s._user_defined!r}, " \
-            "secrets={secrets})". \
-            format(s=self, secrets=secrets)
+        return _REPR_FMT % (
+            self._nickname, self._description, self._contact_name,
+            self._access_via, self._user_defined,
+            "{...}" if self._secrets else "None")
 
     @property
     def nickname(self):
@@ -16,11 +16,16 @@ Support for server files.
 
 from __future__ import absolute_import, print_function
 import os
-import yaml
-import jsonschema
+from copy import deepcopy
+from collections import OrderedDict
 
 from ._server import Server
-from ._vault_file import VaultFile
+from ._vault_file import VaultFile, _is_vault_file_encrypted
+from ._utils import _schema_validator, _validate, _elem_str, _intern
+
+# Note: The yaml and jsonschema packages are imported only when a server file
+# is loaded, because importing them is expensive and should not be paid by a
+# plain 'import easy_server'.
 
 __all__ = ['ServerFile', 'ServerFileException',
            'ServerFileOpenError', 'ServerFileFormatError',
@@ -137,6 +142,71 @@ SERVER_FILE_SCHEMA = {
 }
 
 
+# Validator for the server files, see _server_file_validator()
+_SERVER_FILE_VALIDATOR = None
+
+
+def _server_file_validator():
+    """
+    Return the validator for the server files, creating it on first use.
+    """
+    global _SERVER_FILE_VALIDATOR  # pylint: disable=global-statement
+    if _SERVER_FILE_VALIDATOR is None:
+        _SERVER_FILE_VALIDATOR = _schema_validator(SERVER_FILE_SCHEMA)
+    return _SERVER_FILE_VALIDATOR
+
+
+# Validation function for the server files that is generated by the optional
+# fastjsonschema package, see _fast_validate_server_file(). None means it has
+# not been generated yet, False means fastjsonschema is not installed.
+_SERVER_FILE_FAST_VALIDATE = None
+
+
+def _fast_validate_server_file(data):
+    """
+    Validate the content of a server file using the validation function
+    generated by the fastjsonschema package, if that package is installed.
+
+    The generated function is much faster than jsonschema, but its error
+    messages differ. So its result is only used to skip the validation with
+    jsonschema for valid content.
+
+    Returns:
+      bool: Boolean indicating that the content is valid. False indicates that
+      the content is invalid or that the fastjsonschema package is not
+      installed, so it needs to be validated with jsonschema.
+    """
+    global _SERVER_FILE_FAST_VALIDATE  # pylint: disable=global-statement
+    if _SERVER_FILE_FAST_VALIDATE is None:
+        try:
+            # pylint: disable=import-outside-toplevel
+            import fastjsonschema
+        except ImportError:
+            _SERVER_FILE_FAST_VALIDATE = False
+        else:
+            _SERVER_FILE_FAST_VALIDATE = fastjsonschema.compile(
+                SERVER_FILE_SCHEMA)
+    if _SERVER_FILE_FAST_VALIDATE is False:
+        return False
+    try:
+        _SERVER_FILE_FAST_VALIDATE(data)
+    except ValueError:
+        # fastjsonschema.JsonSchemaException is derived from ValueError
+        return False
+    return True
+
+
+# Cache of server file content that has been validated against the server
+# file schema, by absolute path name of the server file. Each item value is a
+# tuple(stat_key, data), where stat_key is used to detect changes of the file.
+# The items are ordered from least to most recently used, and the least
+# recently used item is removed when the cache is full.
+_SERVER_FILE_CACHE = OrderedDict()
+
+# Maximum number of server files in _SERVER_FILE_CACHE
+_SERVER_FILE_CACHE_MAXSIZE = 32
+
+
 class ServerFileException(Exception):
     """
     Abstract base exception for errors related to server files.
@@ -228,10 +298,17 @@ class ServerFile(object):
     :ref:`Server files` and :ref:`Vault files`.
     """
 
+    __slots__ = ('_filepath', '_user_defined_schema',
+                 '_group_user_defined_schema', '_vault_server_schema',
+                 '_data', '_vault_file', '_vault', '_servers',
+                 '_server_groups', '_default', '_group_cache',
+                 '_vault_kwargs')
+
     def __init__(
             self, filepath, password=None, use_keyring=True, use_prompting=True,
             verbose=False, user_defined_schema=None,
-            group_user_defined_schema=None, vault_server_schema=None):
+            group_user_defined_schema=None, vault_server_schema=None,
+            lazy_vault=False):
         """
         Parameters:
 
@@ -270,6 +347,14 @@ class ServerFile(object):
             loading the vault file.
             `None` means no schema validation takes place for these items.
 
+          lazy_vault (bool):
+            Defer loading the vault file until it is first needed, i.e. when
+            a server is retrieved. The exceptions related to the vault file
+            are then raised by the methods that retrieve servers instead of by
+            this init method. This saves the
+            loading of the vault file (including a possible password prompt)
+            for users that do not need any servers.
+
         Raises:
           ServerFileOpenError: Error opening server file
           ServerFileFormatError: Invalid server file format
@@ -302,18 +387,36 @@ class ServerFile(object):
             if not os.path.isabs(self._vault_file):
                 self._vault_file = os.path.join(
                     os.path.dirname(self._filepath), self._vault_file)
-            self._vault = VaultFile(
-                self._vault_file, password=password, use_keyring=use_keyring,
+            self._vault_kwargs = dict(
+                password=password, use_keyring=use_keyring,
                 use_prompting=use_prompting, verbose=verbose,
                 server_schema=vault_server_schema)
         else:
-            self._vault = None
+            self._vault_kwargs = None
+        self._vault = None
+        if not lazy_vault:
+            self._get_vault()
 
         # The following attributes are for faster access
         self._servers = self._data['servers']
         self._server_groups = self._data['server_groups']
         self._default = self._data['default']
 
+        # Server nicknames of server groups that have been listed, by group
+        # nickname
+        self._group_cache = {}
+
+    def _get_vault(self):
+        """
+        Return the VaultFile object for the vault file, loading the vault file
+        if that has not happened yet, or `None` if no vault file is specified.
+        """
+        if self._vault_kwargs is not None:
+            self._vault = VaultFile(self._vault_file, **self._vault_kwargs)
+            # The password is no longer needed
+            self._vault_kwargs = None
+        return self._vault
+
     @property
     def filepath(self):
         """
@@ -362,18 +465,31 @@ class ServerFile(object):
 
         If the server file does not specify a vault file, `None` is returned.
 
+        This method does not load the vault file, so it does not need the
+        vault password.
+
         Returns:
           bool: Boolean indicating whether the vault file is in the encrypted
           state, or `None` if no vault file was specified.
+
+        Raises:
+          VaultFileOpenError: Error with opening the vault file (only if the
+            vault file has not been loaded yet, see the `lazy_vault` init
+            parameter)
         """
-        if self._vault is None:
+        if self._vault is not None:
+            return self._vault.is_encrypted()
+        if not self._vault_file:
             return None
-        return self._vault.is_encrypted()
+        return _is_vault_file_encrypted(self._vault_file)
 
     def get_server(self, nickname):
         """
         Get server for a given server nickname.
 
+        If the vault file has not been loaded yet (see the `lazy_vault` init
+        parameter), it is loaded by this method.
+
         Parameters:
           nickname (:term:`unicode string`): Server nickname.
 
@@ -383,6 +499,13 @@ class ServerFile(object):
 
         Raises:
           :exc:`py:KeyError`: Nickname not found
+          VaultFileOpenError: Error with opening the vault file
+          VaultFileDecryptError: Error with decrypting the vault file
+          VaultFileFormatError: Invalid vault file format
+          VaultFileServerFormatError: Invalid format of server items in the
+            vault file
+          VaultFileServerSchemaError: Invalid JSON schema for validating server
+            items in the vault file
         """
         try:
             server_dict = self._servers[nickname]
@@ -393,11 +516,9 @@ class ServerFile(object):
                 format(nickname, self._filepath))
             new_exc.__cause__ = None
             raise new_exc  # KeyError
-        if self._vault:
-            try:
-                secrets_dict = self._vault.get_secrets(nickname)
-            except KeyError:
-                secrets_dict = None
+        vault = self._get_vault()
+        if vault and vault.has_secrets(nickname):
+            secrets_dict = vault.get_secrets(nickname)
         else:
             secrets_dict = None
         return Server(nickname, server_dict, secrets_dict)
@@ -406,6 +527,9 @@ class ServerFile(object):
         """
         List the servers for a given server or server group nickname.
 
+        If the vault file has not been loaded yet (see the `lazy_vault` init
+        parameter), it is loaded by this method.
+
         Parameters:
           nickname (:term:`unicode string`): Server or server group nickname.
 
@@ -415,26 +539,55 @@ class ServerFile(object):
 
         Raises:
           :exc:`py:KeyError`: Nickname not found
+          VaultFileOpenError: Error with opening the vault file
+          VaultFileDecryptError: Error with decrypting the vault file
+          VaultFileFormatError: Invalid vault file format
+          VaultFileServerFormatError: Invalid format of server items in the
+            vault file
+          VaultFileServerSchemaError: Invalid JSON schema for validating server
+            items in the vault file
         """
         if nickname in self._servers:
             return [self.get_server(nickname)]
 
-        if nickname in self._server_groups:
-            sd_list = list()  # of Server objects
-            sd_nick_list = list()  # of server nicknames
-            sg_item = self._server_groups[nickname]
-            for member_nick in sg_item['members']:
-                member_sds = self.list_servers(member_nick)
-                for sd in member_sds:
-                    if sd.nickname not in sd_nick_list:
-                        sd_nick_list.append(sd.nickname)
-                        sd_list.append(sd)
-            return sd_list
-
-        raise KeyError(
-            "Server or server group with nickname {!r} not found in server "
-            "definition file {!r}".
-            format(nickname, self._filepath))
+        sd_nick_list = self._group_cache.get(nickname, None)
+        if sd_nick_list is None:
+            if nickname not in self._server_groups:
+                raise KeyError(
+                    "Server or server group with nickname {!r} not found in "
+                    "server definition file {!r}".
+                    format(nickname, self._filepath))
+            sd_nick_list = self._group_server_nicks(nickname)
+            self._group_cache[nickname] = sd_nick_list
+
+        get_server = self.get_server
+        return [get_server(nick) for nick in sd_nick_list]
+
+    def _group_server_nicks(self, nickname):
+        """
+        Return the nicknames of the servers in a server group, including its
+        nested server groups, in the order of their first occurrence.
+
+        The server group is traversed depth-first without recursion. Server
+        groups that have already been traversed are skipped.
+        """
+        sd_nick_list = list()  # of server nicknames, in order
+        sd_nicks = set()  # of server nicknames
+        sg_nicks = set()  # of server group nicknames
+        stack = [nickname]
+        while stack:
+            nick = stack.pop()
+            # Group members have been verified to be servers or server groups
+            # when loading the server file. Like in list_servers(), a nickname
+            # that is both a server and a server group is a server.
+            if nick in self._servers:
+                if nick not in sd_nicks:
+                    sd_nicks.add(nick)
+                    sd_nick_list.append(nick)
+            elif nick not in sg_nicks:
+                sg_nicks.add(nick)
+                stack.extend(reversed(self._server_groups[nick]['members']))
+        return sd_nick_list
 
     def list_default_servers(self):
         """
@@ -443,9 +596,21 @@ class ServerFile(object):
         An omitted 'default' element in the server file results in
         an empty list.
 
+        If the vault file has not been loaded yet (see the `lazy_vault` init
+        parameter), it is loaded by this method.
+
         Returns:
           list of :class:`~easy_server.Server`:
           List of servers.
+
+        Raises:
+          VaultFileOpenError: Error with opening the vault file
+          VaultFileDecryptError: Error with decrypting the vault file
+          VaultFileFormatError: Invalid vault file format
+          VaultFileServerFormatError: Invalid format of server items in the
+            vault file
+          VaultFileServerSchemaError: Invalid JSON schema for validating server
+            items in the vault file
         """
         if self._default is None:
             return []
@@ -455,11 +620,62 @@ class ServerFile(object):
         """
         List all servers.
 
+        If the vault file has not been loaded yet (see the `lazy_vault` init
+        parameter), it is loaded by this method.
+
         Returns:
           list of :class:`~easy_server.Server`:
           List of servers.
+
+        Raises:
+          VaultFileOpenError: Error with opening the vault file
+          VaultFileDecryptError: Error with decrypting the vault file
+          VaultFileFormatError: Invalid vault file format
+          VaultFileServerFormatError: Invalid format of server items in the
+            vault file
+          VaultFileServerSchemaError: Invalid JSON schema for validating server
+            items in the vault file
         """
-        return [self.get_server(nickname) for nickname in self._servers]
+        get_server = self.get_server
+        return [get_server(nickname) for nickname in self._servers]
+
+    def iter_all_servers(self):
+        """
+        Iterate through all servers.
+
+        In contrast to :meth:`list_all_servers`, the Server objects are created
+        only when the iteration reaches them, so callers that stop early do not
+        pay for the remaining servers.
+
+        If the vault file has not been loaded yet (see the `lazy_vault` init
+        parameter), it is loaded when the iteration reaches the first server.
+
+        Returns:
+          iterator of :class:`~easy_server.Server`:
+          Iterator through the servers.
+
+        Raises:
+          VaultFileOpenError: Error with opening the vault file
+          VaultFileDecryptError: Error with decrypting the vault file
+          VaultFileFormatError: Invalid vault file format
+          VaultFileServerFormatError: Invalid format of server items in the
+            vault file
+          VaultFileServerSchemaError: Invalid JSON schema for validating server
+            items in the vault file
+        """
+        get_server = self.get_server
+        return (get_server(nickname) for nickname in self._servers)
+
+    @staticmethod
+    def clear_cache():
+        """
+        Clear the cache of server file content.
+
+        The validated content of the most recently loaded server files is
+        cached in order to speed up loading them again, as long as they do not
+        change. This method removes all server files from that cache.
+        """
+        _SERVER_FILE_CACHE.clear()
 
 
 def _load_server_file(
@@ -483,58 +699,37 @@ def _load_server_file(
       ServerFileGroupUserDefinedSchemaError: Invalid JSON schema for
         validating user-defined portion of group items in the server file
     """
+    # pylint: disable=import-outside-toplevel
+    import jsonschema
 
-    # Load the server file (YAML)
-    try:
-        with open(filepath, 'r') as fp:
-            data = yaml.safe_load(fp)
-    except (OSError, IOError) as exc:
-        new_exc = ServerFileOpenError(
-            "Cannot open server file: {fn}: {exc}".
-            format(fn=filepath, exc=exc))
-        new_exc.__cause__ = None
-        raise new_exc  # ServerFileOpenError
-    except yaml.YAMLError as exc:
-        new_exc = ServerFileFormatError(
-            "Invalid YAML syntax in server file {fn}: {exc}".
-            format(fn=filepath, exc=exc))
-        new_exc.__cause__ = None
-        raise new_exc  # ServerFileFormatError
-
-    # Schema validation of server file content
-    try:
-        jsonschema.validate(data, SERVER_FILE_SCHEMA)
-        # Raises jsonschema.exceptions.SchemaError if JSON schema is invalid
-    except jsonschema.exceptions.ValidationError as exc:
-        if exc.absolute_path:
-            elem_str = "element '{}'". \
-                format('.'.join(str(e) for e in exc.absolute_path))
-        else:
-            elem_str = 'top-level element'
-
-        new_exc = ServerFileFormatError(
-            "Invalid format in server file {fn}: Validation "
-            "failed on {elem}: {exc}".
-            format(fn=filepath, elem=elem_str, exc=exc))
-        new_exc.__cause__ = None
-        raise new_exc  # ServerFileFormatError
+    data = _read_server_file(filepath)
 
     # Establish defaults for optional top-level elements
-
-    if 'server_groups' not in data:
-        data['server_groups'] = {}
-
-    if 'default' not in data:
-        data['default'] = None
-
-    if 'vault_file' not in data:
-        data['vault_file'] = None
+    data.setdefault('server_groups', {})
+    data.setdefault('default', None)
+    data.setdefault('vault_file', None)
+
+    # Intern the short string values that tend to be repeated across the
+    # server items, so that they are stored only once
+    for server_item in data['servers'].values():
+        for key in ('contact_name', 'access_via'):
+            value = server_item.get(key, None)
+            if isinstance(value, str):
+                server_item[key] = _intern(value)
 
     # Schema validation of user-defined portion of server items
-    if user_defined_schema:
+    if user_defined_schema and data['servers']:
+        try:
+            validator = _schema_validator(user_defined_schema)
+        except jsonschema.exceptions.SchemaError as exc:
+            new_exc = ServerFileUserDefinedSchemaError(
+                "Invalid JSON schema for validating user-defined portion "
+                "of server items in server file: {exc}".
+                format(exc=exc))
+            new_exc.__cause__ = None
+            raise new_exc  # ServerFileUserDefinedSchemaError
         for server_nick, server_item in data['servers'].items():
-            user_defined = server_item.get('user_defined', None)
-            if user_defined is None:
+            if 'user_defined' not in server_item:
                 new_exc = ServerFileUserDefinedFormatError(
                     "Missing user_defined element for server {srv} "
                     "in server file {fn}".
@@ -542,20 +737,10 @@ def _load_server_file(
                 new_exc.__cause__ = None
                 raise new_exc  # ServerFileUserDefinedFormatError
             try:
-                jsonschema.validate(user_defined, user_defined_schema)
-            except jsonschema.exceptions.SchemaError as exc:
-                new_exc = ServerFileUserDefinedSchemaError(
-                    "Invalid JSON schema for validating user-defined portion "
-                    "of server items in server file: {exc}".
-                    format(exc=exc))
-                new_exc.__cause__ = None
-                raise new_exc  # ServerFileUserDefinedSchemaError
+                _validate(validator, server_item['user_defined'])
             except jsonschema.exceptions.ValidationError as exc:
-                if exc.absolute_path:
-                    elem_str = "element '{}'". \
-                        format('.'.join(str(e) for e in exc.absolute_path))
-                else:
-                    elem_str = "top-level of user-defined item"
+                elem_str = _elem_str(
+                    exc.absolute_path, "top-level of user-defined item")
                 new_exc = ServerFileUserDefinedFormatError(
                     "Invalid format in user-defined portion of item for "
                     "server {srv} in server file {fn}: "
@@ -566,10 +751,18 @@ def _load_server_file(
                 raise new_exc  # ServerFileUserDefinedFormatError
 
     # Schema validation of user-defined portion of group items
-    if group_user_defined_schema:
+    if group_user_defined_schema and data['server_groups']:
+        try:
+            validator = _schema_validator(group_user_defined_schema)
+        except jsonschema.exceptions.SchemaError as exc:
+            new_exc = ServerFileGroupUserDefinedSchemaError(
+                "Invalid JSON schema for validating user-defined portion "
+                "of group items in server file: {exc}".
+                format(exc=exc))
+            new_exc.__cause__ = None
+            raise new_exc  # ServerFileGroupUserDefinedSchemaError
         for group_nick, group_item in data['server_groups'].items():
-            user_defined = group_item.get('user_defined', None)
-            if user_defined is None:
+            if 'user_defined' not in group_item:
                 new_exc = ServerFileGroupUserDefinedFormatError(
                     "Missing user_defined element for group {grp} "
                     "in server file {fn}".
@@ -577,20 +770,10 @@ def _load_server_file(
                 new_exc.__cause__ = None
                 raise new_exc  # ServerFileGroupUserDefinedFormatError
             try:
-                jsonschema.validate(user_defined, group_user_defined_schema)
-            except jsonschema.exceptions.SchemaError as exc:
-                new_exc = ServerFileGroupUserDefinedSchemaError(
-                    "Invalid JSON schema for validating user-defined portion "
-                    "of group items in server file: {exc}".
-                    format(exc=exc))
-                new_exc.__cause__ = None
-                raise new_exc  # ServerFileGroupUserDefinedSchemaError
+                _validate(validator, group_item['user_defined'])
             except jsonschema.exceptions.ValidationError as exc:
-                if exc.absolute_path:
-                    elem_str = "element '{}'". \
-                        format('.'.join(str(e) for e in exc.absolute_path))
-                else:
-                    elem_str = "top-level of user-defined item"
+                elem_str = _elem_str(
+                    exc.absolute_path, "top-level of user-defined item")
                 new_exc = ServerFileGroupUserDefinedFormatError(
                     "Invalid format in user-defined portion of item for "
                     "group {grp} in server file {fn}: "
@@ -602,9 +785,8 @@ def _load_server_file(
 
     # Check dependencies in the file
 
-    server_nicks = list(data['servers'].keys())
-    group_nicks = list(data['server_groups'].keys())
-    all_nicks = server_nicks + group_nicks
+    all_nicks = set(data['servers'])
+    all_nicks.update(data['server_groups'])
     default_nick = data['default']
 
     if default_nick and default_nick not in all_nicks:
@@ -615,15 +797,155 @@ def _load_server_file(
         new_exc.__cause__ = None
         raise new_exc  # ServerFileFormatError
 
-    for group_nick in group_nicks:
-        sg_item = data['server_groups'][group_nick]
-        for member_nick in sg_item['members']:
-            if member_nick not in all_nicks:
-                new_exc = ServerFileFormatError(
-                    "Nickname '{n}' in server group '{g}' not found in "
-                    "servers or groups in server file {fn}".
-                    format(n=member_nick, g=group_nick, fn=filepath))
-                new_exc.__cause__ = None
-                raise new_exc  # ServerFileFormatError
+    member_nicks = set()
+    for sg_item in data['server_groups'].values():
+        member_nicks.update(sg_item['members'])
+
+    if not member_nicks.issubset(all_nicks):
+        # Find the first offending member for the error message
+        for group_nick, sg_item in data['server_groups'].items():
+            for member_nick in sg_item['members']:
+                if member_nick not in all_nicks:
+                    new_exc = ServerFileFormatError(
+                        "Nickname '{n}' in server group '{g}' not found in "
+                        "servers or groups in server file {fn}".
+                        format(n=member_nick, g=group_nick, fn=filepath))
+                    new_exc.__cause__ = None
+                    raise new_exc  # ServerFileFormatError
+
+    # Check that no server group is directly or indirectly a member of itself.
+    # This is a depth-first search without recursion, that keeps the server
+    # groups on the current path and skips server groups that have already
+    # been found to have no cycles. Like in ServerFile.list_servers(), a
+    # nickname that is both a server and a server group is a server, so such
+    # server groups are never traversed and are skipped.
+    sd_items = data['servers']
+    sg_items = data['server_groups']
+    no_cycle_nicks = set()  # of server group nicknames
+    for start_nick in sg_items:
+        if start_nick in no_cycle_nicks or start_nick in sd_items:
+            continue
+        path = [start_nick]  # of server group nicknames
+        path_nicks = set(path)
+        member_iters = [iter(sg_items[start_nick]['members'])]
+        while member_iters:
+            for member_nick in member_iters[-1]:
+                if member_nick in sd_items or member_nick not in sg_items \
+                        or member_nick in no_cycle_nicks:
+                    continue
+                if member_nick in path_nicks:
+                    cycle = path[path.index(member_nick):] + [member_nick]
+                    new_exc = ServerFileFormatError(
+                        "Server group '{g}' is a member of itself via "
+                        "{c} in server file {fn}".
+                        format(g=member_nick, c=' -> '.join(cycle),
+                               fn=filepath))
+                    new_exc.__cause__ = None
+                    raise new_exc  # ServerFileFormatError
+                path.append(member_nick)
+                path_nicks.add(member_nick)
+                member_iters.append(iter(sg_items[member_nick]['members']))
+                break
+            else:
+                # All members of the last group on the path are done
+                done_nick = path.pop()
+                path_nicks.remove(done_nick)
+                no_cycle_nicks.add(done_nick)
+                member_iters.pop()
+
+    # Intern the nicknames, so that the same nickname is stored only once and
+    # lookups by nickname can mostly compare the strings by identity
+    data['servers'] = dict(
+        (_intern(nick), item) for nick, item in data['servers'].items())
+    data['server_groups'] = dict(
+        (_intern(nick), item) for nick, item in data['server_groups'].items())
+    for sg_item in data['server_groups'].values():
+        sg_item['members'] = [_intern(nick) for nick in sg_item['members']]
+    if data['default']:
+        data['default'] = _intern(data['default'])
+
+    return data
+
+
+def _read_server_file(filepath):
+    """
+    Read the server file and validate its content against the server file
+    schema.
+
+    The validated file content is cached, so that loading an unchanged server
+    file again does not need to parse and validate it again. A change of the
+    modification time, size or inode of the file invalidates the cached
+    content.
+
+    Returns:
+      dict: Python dict representing the file content. This is a copy of the
+      cached content that may be modified by the caller.
+
+    Raises:
+      ServerFileOpenError: Error opening server file
+      ServerFileFormatError: Invalid server file content
+    """
+
+    try:
+        st = os.stat(filepath)
+    except (OSError, IOError) as exc:
+        new_exc = ServerFileOpenError(
+            "Cannot open server file: {fn}: {exc}".
+            format(fn=filepath, exc=exc))
+        new_exc.__cause__ = None
+        raise new_exc  # ServerFileOpenError
+    # The nanosecond timestamps are not available on Python 2. The change time
+    # detects rewrites that restore the modification time.
+    stat_key = (getattr(st, 'st_mtime_ns', st.st_mtime),
+                getattr(st, 'st_ctime_ns', st.st_ctime),
+                st.st_size, st.st_ino)
+    abs_filepath = os.path.abspath(filepath)
+
+    cached = _SERVER_FILE_CACHE.pop(abs_filepath, None)
+    if cached is not None and cached[0] == stat_key:
+        # Re-add the item to make it the most recently used one
+        _SERVER_FILE_CACHE[abs_filepath] = cached
+        return deepcopy(cached[1])
+
+    # pylint: disable=import-outside-toplevel
+    import yaml
+    import jsonschema
+
+    # Use the libyaml based loader if PyYAML was built with libyaml
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    # Load the server file (YAML)
+    try:
+        with open(filepath, 'rb') as fp:
+            content = fp.read()
+        data = yaml.load(content, Loader=loader)
+    except (OSError, IOError) as exc:
+        new_exc = ServerFileOpenError(
+            "Cannot open server file: {fn}: {exc}".
+            format(fn=filepath, exc=exc))
+        new_exc.__cause__ = None
+        raise new_exc  # ServerFileOpenError
+    except yaml.YAMLError as exc:
+        new_exc = ServerFileFormatError(
+            "Invalid YAML syntax in server file {fn}: {exc}".
+            format(fn=filepath, exc=exc))
+        new_exc.__cause__ = None
+        raise new_exc  # ServerFileFormatError
+
+    # Schema validation of server file content
+    if not _fast_validate_server_file(data):
+        try:
+            _validate(_server_file_validator(), data)
+        except jsonschema.exceptions.ValidationError as exc:
+            elem_str = _elem_str(exc.absolute_path, "top-level element")
+            new_exc = ServerFileFormatError(
+                "Invalid format in server file {fn}: Validation "
+                "failed on {elem}: {exc}".
+                format(fn=filepath, elem=elem_str, exc=exc))
+            new_exc.__cause__ = None
+            raise new_exc  # ServerFileFormatError
 
+    if len(_SERVER_FILE_CACHE) >= _SERVER_FILE_CACHE_MAXSIZE:
+        _SERVER_FILE_CACHE.popitem(last=False)
+    _SERVER_FILE_CACHE[abs_filepath] = (stat_key, deepcopy(data))
     return data
@@ -0,0 +1,71 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Internal utility functions.
+"""
+
+from __future__ import absolute_import, print_function
+try:
+    from sys import intern as _intern
+except ImportError:
+    # Python 2
+    _intern = intern  # noqa: F821 pylint: disable=undefined-variable
+
+__all__ = []
+
+
+def _schema_validator(schema):
+    """
+    Return a validator object for a JSON schema, that can be used for
+    validating multiple instances without processing the schema again.
+
+    Raises:
+      jsonschema.exceptions.SchemaError: Invalid JSON schema
+    """
+    # pylint: disable=import-outside-toplevel
+    import jsonschema
+    cls = jsonschema.validators.validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+def _validate(validator, instance):
+    """
+    Validate an instance using a validator object.
+
+    Like jsonschema.validate(), the most relevant error is raised if there are
+    multiple validation errors, so that the error messages are the same as
+    with jsonschema.validate().
+
+    Raises:
+      jsonschema.exceptions.ValidationError: Validation failed
+    """
+    # pylint: disable=import-outside-toplevel
+    import jsonschema
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
+
+def _elem_str(path, toplevel_str):
+    """
+    Return a string describing the element of a JSON schema validation error
+    for use in error messages.
+
+    Parameters:
+      path (sequence): Absolute path of the element.
+      toplevel_str (string): String to be used for the top-level element.
+    """
+    if not path:
+        return toplevel_str
+    return "element '{}'".format('.'.join(map(str, path)))
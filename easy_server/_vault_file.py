@@ -17,9 +17,12 @@ Support for vault files.
 from __future__ import absolute_import, print_function
 import os
 from copy import deepcopy
-import jsonschema
-import easy_vault
 
+from ._utils import _schema_validator, _validate, _elem_str, _intern
+
+# Note: The yaml, jsonschema and easy_vault packages are imported only when a
+# vault file is loaded, because importing them is expensive (easy_vault imports
+# the keyring package) and should not be paid by a plain 'import easy_server'.
 
 __all__ = ['VaultFile', 'VaultFileException', 'VaultFileOpenError',
            'VaultFileDecryptError', 'VaultFileFormatError',
@@ -53,6 +56,92 @@ VAULT_FILE_SCHEMA = {
 }
 
 
+# Immutable types of values in secrets items, which do not need to be copied
+# when copying a secrets item. YAML strings are unicode on Python 2.
+_SCALAR_TYPES = (type(None), bool, int, float, type(u''), type(b''))
+
+
+def _copy_value(value):
+    """
+    Return a deep copy of a value from a vault file.
+
+    This is faster than copy.deepcopy() for the dicts, lists and scalar values
+    that are produced by loading YAML, and falls back to copy.deepcopy() for
+    any other types.
+    """
+    if isinstance(value, _SCALAR_TYPES):
+        return value
+    if isinstance(value, dict):
+        return dict((k, _copy_value(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return [_copy_value(v) for v in value]
+    return deepcopy(value)
+
+
+def _intern_keys(secrets_dict):
+    """
+    Return a copy of a secrets item in which the keys that are str objects
+    have been interned. On Python 2, non-ASCII keys are unicode objects,
+    which cannot be interned.
+    """
+    return dict(
+        (_intern(k) if isinstance(k, str) else k, v)
+        for k, v in secrets_dict.items())
+
+
+# Validator for the vault files, see _vault_file_validator()
+_VAULT_FILE_VALIDATOR = None
+
+
+def _vault_file_validator():
+    """
+    Return the validator for the vault files, creating it on first use.
+    """
+    global _VAULT_FILE_VALIDATOR  # pylint: disable=global-statement
+    if _VAULT_FILE_VALIDATOR is None:
+        _VAULT_FILE_VALIDATOR = _schema_validator(VAULT_FILE_SCHEMA)
+    return _VAULT_FILE_VALIDATOR
+
+
+# Validation function for the vault files that is generated by the optional
+# fastjsonschema package, see _fast_validate_vault_file(). None means it has
+# not been generated yet, False means fastjsonschema is not installed.
+_VAULT_FILE_FAST_VALIDATE = None
+
+
+def _fast_validate_vault_file(vault_obj):
+    """
+    Validate the content of a vault file using the validation function
+    generated by the fastjsonschema package, if that package is installed.
+
+    The result is only used to skip the validation with jsonschema for valid
+    content, so that the error messages remain those of jsonschema.
+
+    Returns:
+      bool: Boolean indicating that the content is valid. False indicates that
+      the content is invalid or that the fastjsonschema package is not
+      installed, so it needs to be validated with jsonschema.
+    """
+    global _VAULT_FILE_FAST_VALIDATE  # pylint: disable=global-statement
+    if _VAULT_FILE_FAST_VALIDATE is None:
+        try:
+            # pylint: disable=import-outside-toplevel
+            import fastjsonschema
+        except ImportError:
+            _VAULT_FILE_FAST_VALIDATE = False
+        else:
+            _VAULT_FILE_FAST_VALIDATE = fastjsonschema.compile(
+                VAULT_FILE_SCHEMA)
+    if _VAULT_FILE_FAST_VALIDATE is False:
+        return False
+    try:
+        _VAULT_FILE_FAST_VALIDATE(vault_obj)
+    except ValueError:
+        # fastjsonschema.JsonSchemaException is derived from ValueError
+        return False
+    return True
+
+
 class VaultFileException(Exception):
     """
     Abstract base exception for errors related to vault files.
@@ -138,6 +227,9 @@ class VaultFile(object):
     and not to use the keyring.
     """
 
+    __slots__ = ('_filepath', '_server_schema', '_vault_obj', '_encrypted',
+                 '_secrets')
+
     def __init__(
             self, filepath, password=None, use_keyring=True, use_prompting=True,
             verbose=False, server_schema=None):
@@ -216,6 +308,20 @@ class VaultFile(object):
         """
         return self._encrypted
 
+    def has_secrets(self, nickname):
+        """
+        Test whether the vault file has a secrets item for a given server
+        nickname.
+
+        Parameters:
+          nickname (:term:`unicode string`): Server nickname.
+
+        Returns:
+          bool: Boolean indicating whether the vault file has a secrets item
+          for the server.
+        """
+        return nickname in self._secrets
+
     def get_secrets(self, nickname):
         """
         Get the secrets item from the vault file for a given server nickname.
@@ -259,7 +365,12 @@ class VaultFile(object):
                 format(n=nickname, fn=self._filepath))
             new_exc.__cause__ = None
             raise new_exc  # KeyError
-        return deepcopy(secrets_dict)
+        # Secrets items usually have only scalar values, for which a shallow
+        # copy is sufficient and much faster than a deep copy.
+        for value in secrets_dict.values():
+            if not isinstance(value, _SCALAR_TYPES):
+                return _copy_value(secrets_dict)
+        return dict(secrets_dict)
 
 
 def _load_vault_file(
@@ -311,22 +422,30 @@ def _load_vault_file(
       VaultFileServerSchemaError: Invalid JSON schema for validating the
         server items in the vault file
     """
+    # pylint: disable=import-outside-toplevel
+    import yaml
+    import jsonschema
+    import easy_vault
 
+    vault = easy_vault.EasyVault(filepath)
     try:
-        encrypted = easy_vault.EasyVault(filepath).is_encrypted()
+        encrypted = vault.is_encrypted()
     except easy_vault.EasyVaultFileError as exc:
         new_exc = VaultFileOpenError(str(exc))
         new_exc.__cause__ = None
         raise new_exc  # VaultFileOpenError
 
-    if password is None and encrypted:
-        password = easy_vault.get_password(
-            filepath, use_keyring=use_keyring, use_prompting=use_prompting,
-            verbose=verbose)
+    # A vault object with password is needed only for decrypting the vault
+    # file, because calculating the key from the password is expensive.
+    if encrypted:
+        if password is None:
+            password = easy_vault.get_password(
+                filepath, use_keyring=use_keyring,
+                use_prompting=use_prompting, verbose=verbose)
+        vault = easy_vault.EasyVault(filepath, password)
 
-    vault = easy_vault.EasyVault(filepath, password)
     try:
-        vault_obj = vault.get_yaml()
+        vault_bytes = vault.get_bytes()
     except easy_vault.EasyVaultFileError as exc:
         new_exc = VaultFileOpenError(str(exc))
         new_exc.__cause__ = None
@@ -335,8 +454,16 @@ def _load_vault_file(
         new_exc = VaultFileDecryptError(str(exc))
         new_exc.__cause__ = None
         raise new_exc  # VaultFileDecryptError
-    except easy_vault.EasyVaultYamlError as exc:
-        new_exc = VaultFileFormatError(str(exc))
+
+    # The YAML is loaded here instead of using EasyVault.get_yaml(), in order
+    # to use the libyaml based loader if PyYAML was built with libyaml.
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    try:
+        vault_obj = yaml.load(vault_bytes, Loader=loader)
+    except yaml.YAMLError as exc:
+        new_exc = VaultFileFormatError(
+            "Invalid YAML syntax in vault file {fn}: {exc}".
+            format(fn=filepath, exc=exc))
         new_exc.__cause__ = None
         raise new_exc  # VaultFileFormatError
 
@@ -345,40 +472,37 @@ def _load_vault_file(
             filepath, password, use_keyring=use_keyring, verbose=verbose)
 
     # Validate the data object using JSON schema
-    try:
-        jsonschema.validate(vault_obj, VAULT_FILE_SCHEMA)
-        # Raises jsonschema.exceptions.SchemaError if JSON schema is invalid
-    except jsonschema.exceptions.ValidationError as exc:
-        if exc.absolute_path:
-            elem_str = "element '{}'". \
-                format('.'.join(str(e) for e in exc.absolute_path))
-        else:
-            elem_str = 'top-level element'
-        new_exc = VaultFileFormatError(
-            "Invalid format in vault file {fn}: Validation failed on {elem}: "
-            "{msg}".
-            format(fn=filepath, elem=elem_str, msg=exc.message))
-        new_exc.__cause__ = None
-        raise new_exc  # VaultFileFormatError
+    if not _fast_validate_vault_file(vault_obj):
+        try:
+            _validate(_vault_file_validator(), vault_obj)
+        except jsonschema.exceptions.ValidationError as exc:
+            elem_str = _elem_str(exc.absolute_path, "top-level element")
+            new_exc = VaultFileFormatError(
+                "Invalid format in vault file {fn}: Validation failed on "
+                "{elem}: {msg}".
+                format(fn=filepath, elem=elem_str, msg=exc.message))
+            new_exc.__cause__ = None
+            raise new_exc  # VaultFileFormatError
 
-    # Schema validation of server items
-    if server_schema:
+    # Schema validation of server items. The validator is created only if
+    # there are server items, so that an invalid schema is not detected
+    # for an empty vault file (consistent with jsonschema.validate() per item).
+    if server_schema and vault_obj['secrets']:
+        try:
+            validator = _schema_validator(server_schema)
+        except jsonschema.exceptions.SchemaError as exc:
+            new_exc = VaultFileServerSchemaError(
+                "Invalid JSON schema for validating the server items in "
+                "vault file {fn}: {exc}".
+                format(fn=filepath, exc=exc))
+            new_exc.__cause__ = None
+            raise new_exc  # VaultFileServerSchemaError
         for server_nick, server_item in vault_obj['secrets'].items():
             try:
-                jsonschema.validate(server_item, server_schema)
-            except jsonschema.exceptions.SchemaError as exc:
-                new_exc = VaultFileServerSchemaError(
-                    "Invalid JSON schema for validating the server items in "
-                    "vault file {fn}: {exc}".
-                    format(fn=filepath, exc=exc))
-                new_exc.__cause__ = None
-                raise new_exc  # VaultFileServerSchemaError
+                _validate(validator, server_item)
             except jsonschema.exceptions.ValidationError as exc:
-                if exc.absolute_path:
-                    elem_str = "element '{}'". \
-                        format('.'.join(str(e) for e in exc.absolute_path))
-                else:
-                    elem_str = "top-level of server item"
+                elem_str = _elem_str(
+                    exc.absolute_path, "top-level of server item")
                 new_exc = VaultFileServerFormatError(
                     "Invalid format in server item for server {srv} "
                     "in vault file {fn}: "
@@ -388,4 +512,29 @@ def _load_vault_file(
                 new_exc.__cause__ = None
                 raise new_exc  # VaultFileServerFormatError
 
+    # Intern the nicknames, so that lookups with the (also interned) nicknames
+    # from the server file can mostly compare the strings by identity. Also
+    # intern the keys of the secrets items, which tend to be the same across
+    # the server items, so that they are stored only once.
+    vault_obj['secrets'] = dict(
+        (_intern(nick), _intern_keys(item))
+        for nick, item in vault_obj['secrets'].items())
+
     return vault_obj, encrypted
+
+
+def _is_vault_file_encrypted(filepath):
+    """
+    Return whether a vault file is encrypted, without loading it.
+
+    Raises:
+      VaultFileOpenError: Error with opening the vault file
+    """
+    # pylint: disable=import-outside-toplevel
+    import easy_vault
+    try:
+        return easy_vault.EasyVault(filepath).is_encrypted()
+    except easy_vault.EasyVaultFileError as exc:
+        new_exc = VaultFileOpenError(str(exc))
+        new_exc.__cause__ = None
+        raise new_exc  # VaultFileOpenError
@@ -4,8 +4,6 @@ Example script that processes the servers of a server or group nickname.
 """
 
 import sys
-import os
-from pprint import pprint
 import easy_server
 
 
@@ -35,7 +33,7 @@ def main():
 
     for es in es_list:
         nickname = es.nickname
-        host = es.secrets['host'],
+        host = es.secrets['host']
         username = es.secrets['username']
         password = es.secrets['password']
 
@@ -4,7 +4,6 @@ Example script that shows the content of a vault file.
 """
 
 import sys
-import os
 from pprint import pprint
 import easy_server
 
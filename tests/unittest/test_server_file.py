@@ -17,11 +17,13 @@ Test the _server_file.py module.
 from __future__ import absolute_import, print_function
 import os
 import pytest
+import yaml
 from easy_server import ServerFile, ServerFileFormatError, \
     ServerFileOpenError, ServerFileUserDefinedFormatError, \
     ServerFileUserDefinedSchemaError, ServerFileGroupUserDefinedFormatError, \
-    ServerFileGroupUserDefinedSchemaError
+    ServerFileGroupUserDefinedSchemaError, VaultFileOpenError
 # White box testing: We test an internal function
+from easy_server import _server_file
 from easy_server._server_file import _load_server_file
 
 from ..utils.simplified_test_function import simplified_test_function
@@ -300,6 +302,25 @@ TESTCASES_SF_LOAD = [
          "Validation failed on element 'servers': .* is not of type 'object'"),
         None, True
     ),
+    (
+        "Invalid types for 'default' element and in server item",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers:\n"
+                        "  srv1:\n"
+                        "    description: 1\n"
+                        "default: 5\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            user_defined_schema=None,
+            group_user_defined_schema=None,
+            exp_data=None,
+        ),
+        (ServerFileFormatError,
+         "Validation failed on element 'default': 5 is not of type 'string'"),
+        None, True
+    ),
     (
         "Invalid type for 'server_groups' element: list",
         dict(
@@ -501,6 +522,137 @@ TESTCASES_SF_LOAD = [
          "Nickname 'srv1' in server group 'grp1' not found"),
         None, True
     ),
+    (
+        "Server group that is a member of itself",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers: {}\n"
+                        "server_groups:\n"
+                        "  grp1:\n"
+                        "    description: desc1\n"
+                        "    members:\n"
+                        "      - grp1\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            user_defined_schema=None,
+            group_user_defined_schema=None,
+            exp_data=None,
+        ),
+        (ServerFileFormatError,
+         "Server group 'grp1' is a member of itself via grp1 -> grp1"),
+        None, True
+    ),
+    (
+        "Server group that is indirectly a member of itself",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers:\n"
+                        "  srv1:\n"
+                        "    description: server1\n"
+                        "server_groups:\n"
+                        "  grp1:\n"
+                        "    description: desc1\n"
+                        "    members:\n"
+                        "      - srv1\n"
+                        "      - grp2\n"
+                        "  grp2:\n"
+                        "    description: desc2\n"
+                        "    members:\n"
+                        "      - grp3\n"
+                        "  grp3:\n"
+                        "    description: desc3\n"
+                        "    members:\n"
+                        "      - grp1\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            user_defined_schema=None,
+            group_user_defined_schema=None,
+            exp_data=None,
+        ),
+        (ServerFileFormatError,
+         "Server group 'grp1' is a member of itself via "
+         "grp1 -> grp2 -> grp3 -> grp1"),
+        None, True
+    ),
+    (
+        "Server group with a member that is both a server and a server group",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers:\n"
+                        "  x:\n"
+                        "    description: serverx\n"
+                        "server_groups:\n"
+                        "  x:\n"
+                        "    description: groupx\n"
+                        "    members:\n"
+                        "      - grp1\n"
+                        "  grp1:\n"
+                        "    description: desc1\n"
+                        "    members:\n"
+                        "      - x\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            user_defined_schema=None,
+            group_user_defined_schema=None,
+            exp_data={
+                'servers': {
+                    'x': {'description': 'serverx'},
+                },
+                'server_groups': {
+                    'x': {'description': 'groupx', 'members': ['grp1']},
+                    'grp1': {'description': 'desc1', 'members': ['x']},
+                },
+                'default': None,
+                'vault_file': None,
+            },
+        ),
+        None, None, True
+    ),
+    (
+        "Server group that is a member of two nested server groups",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers:\n"
+                        "  srv1:\n"
+                        "    description: server1\n"
+                        "server_groups:\n"
+                        "  grp1:\n"
+                        "    description: desc1\n"
+                        "    members:\n"
+                        "      - grp2\n"
+                        "      - grp3\n"
+                        "  grp2:\n"
+                        "    description: desc2\n"
+                        "    members:\n"
+                        "      - grp3\n"
+                        "  grp3:\n"
+                        "    description: desc3\n"
+                        "    members:\n"
+                        "      - srv1\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            user_defined_schema=None,
+            group_user_defined_schema=None,
+            exp_data={
+                'servers': {
+                    'srv1': {'description': 'server1'},
+                },
+                'server_groups': {
+                    'grp1': {'description': 'desc1',
+                             'members': ['grp2', 'grp3']},
+                    'grp2': {'description': 'desc2', 'members': ['grp3']},
+                    'grp3': {'description': 'desc3', 'members': ['srv1']},
+                },
+                'default': None,
+                'vault_file': None,
+            },
+        ),
+        None, None, True
+    ),
     (
         "Default nickname not found",
         dict(
@@ -1013,6 +1165,206 @@ def test_ServerFile_load(
         assert act_data == exp_data
 
 
+def count_yaml_load(monkeypatch):
+    """
+    Count the calls to yaml.load(), and return the list of the call arguments.
+    """
+    orig_load = yaml.load
+    calls = []
+
+    def counting_load(*args, **kwargs):
+        "Replacement for yaml.load()"
+        calls.append(args)
+        return orig_load(*args, **kwargs)
+
+    monkeypatch.setattr(yaml, 'load', counting_load)
+    return calls
+
+
+def test_ServerFile_load_cached(monkeypatch):
+    """
+    Test function for loading an unchanged and a changed server file again.
+    """
+
+    server_yaml = "servers:\n" \
+                  "  srv1:\n" \
+                  "    description: server1\n"
+
+    ServerFile.clear_cache()
+    yaml_calls = count_yaml_load(monkeypatch)
+
+    with easy_server_file(TEST_SERVER_FILENAME, server_yaml) as server_filepath:
+
+        data1 = _load_server_file(server_filepath)
+        assert len(yaml_calls) == 1
+        data1['servers']['srv1']['description'] = 'modified'
+
+        # Loading the unchanged file must use the cache, and must not return
+        # the modified data
+        data2 = _load_server_file(server_filepath)
+        assert len(yaml_calls) == 1
+        assert data2['servers']['srv1']['description'] == 'server1'
+
+        # Loading the file after clearing the cache must parse it again
+        ServerFile.clear_cache()
+        _load_server_file(server_filepath)
+        assert len(yaml_calls) == 2
+
+        with open(server_filepath, 'a') as fp:
+            fp.write("  srv2:\n"
+                     "    description: server2\n")
+
+        # Loading the changed file must return the changed data
+        data3 = _load_server_file(server_filepath)
+        assert len(yaml_calls) == 3
+        assert sorted(data3['servers'].keys()) == ['srv1', 'srv2']
+
+
+@pytest.mark.skipif(
+    not hasattr(os.stat_result, 'st_mtime_ns'),
+    reason="Nanosecond timestamps not supported")
+def test_ServerFile_load_cached_restored_mtime():
+    """
+    Test function for loading a server file again that was changed without
+    changing its size and modification time.
+    """
+
+    server_yaml = "servers:\n" \
+                  "  srv1:\n" \
+                  "    description: server1\n"
+
+    ServerFile.clear_cache()
+
+    with easy_server_file(TEST_SERVER_FILENAME, server_yaml) as server_filepath:
+
+        st = os.stat(server_filepath)
+        data1 = _load_server_file(server_filepath)
+        assert data1['servers']['srv1']['description'] == 'server1'
+
+        with open(server_filepath, 'w') as fp:
+            fp.write(server_yaml.replace('server1', 'SERVER1'))
+        os.utime(server_filepath, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+        data2 = _load_server_file(server_filepath)
+        assert data2['servers']['srv1']['description'] == 'SERVER1'
+
+
+def test_ServerFile_load_without_fastjsonschema(monkeypatch):
+    """
+    Test function for loading server files when the fastjsonschema package
+    is not installed, so that only jsonschema is used for validation.
+    """
+
+    ServerFile.clear_cache()
+    monkeypatch.setattr(_server_file, '_SERVER_FILE_FAST_VALIDATE', False)
+
+    server_yaml = "servers:\n" \
+                  "  srv1:\n" \
+                  "    description: server1\n"
+
+    with easy_server_file(TEST_SERVER_FILENAME, server_yaml) as server_filepath:
+        data = _load_server_file(server_filepath)
+        assert data['servers'] == {'srv1': {'description': 'server1'}}
+
+    server_yaml = "servers:\n" \
+                  "  srv1:\n" \
+                  "    description: 1\n"
+
+    with easy_server_file(TEST_SERVER_FILENAME, server_yaml) as server_filepath:
+        with pytest.raises(ServerFileFormatError) as exc_info:
+            _load_server_file(server_filepath)
+        assert "Validation failed on element 'servers.srv1.description'" in \
+            str(exc_info.value)
+
+
+def test_ServerFile_load_cached_maxsize(monkeypatch):
+    """
+    Test function for the removal of the least recently used server file from
+    the cache.
+    """
+
+    server_yaml = "servers:\n" \
+                  "  srv1:\n" \
+                  "    description: server1\n"
+
+    ServerFile.clear_cache()
+    monkeypatch.setattr(_server_file, '_SERVER_FILE_CACHE_MAXSIZE', 2)
+    yaml_calls = count_yaml_load(monkeypatch)
+
+    with easy_server_file(TEST_SERVER_FILENAME, server_yaml) as server_filepath:
+
+        server_dir = os.path.dirname(server_filepath)
+        filepaths = [server_filepath]
+        for filename in ('server2.yml', 'server3.yml'):
+            filepath = os.path.join(server_dir, filename)
+            with open(filepath, 'w') as fp:
+                fp.write(server_yaml)
+            filepaths.append(filepath)
+
+        _load_server_file(filepaths[0])
+        _load_server_file(filepaths[1])
+        _load_server_file(filepaths[0])  # cache hit, most recently used
+        assert len(yaml_calls) == 2
+
+        # Removes the least recently used file from the cache
+        _load_server_file(filepaths[2])
+        assert len(yaml_calls) == 3
+        assert len(_server_file._SERVER_FILE_CACHE) == 2
+
+        _load_server_file(filepaths[0])  # cache hit
+        assert len(yaml_calls) == 3
+        _load_server_file(filepaths[1])  # was removed from the cache
+        assert len(yaml_calls) == 4
+
+
+def test_ServerFile_lazy_vault():
+    """
+    Test function for ServerFile with lazy_vault=True.
+    """
+
+    server_yaml = "vault_file: {vf}\n" \
+                  "servers:\n" \
+                  "  srv1:\n" \
+                  "    description: server1\n". \
+                  format(vf=TEST_VAULT_FILENAME)
+    vault_yaml = "secrets:\n" \
+                 "  srv1:\n" \
+                 "    host: myhost1\n"
+
+    with easy_server_file(
+            TEST_SERVER_FILENAME, server_yaml, TEST_VAULT_FILENAME,
+            vault_yaml) as server_filepath:
+
+        esf = ServerFile(server_filepath, lazy_vault=True)
+
+        # The vault file is loaded when a server is retrieved
+        server = esf.get_server('srv1')
+        assert server.secrets == {'host': 'myhost1'}
+        assert esf.is_vault_file_encrypted() is False
+
+    with easy_server_file(
+            TEST_SERVER_FILENAME, server_yaml) as server_filepath:
+
+        # The missing vault file is not detected at initialization
+        esf = ServerFile(server_filepath, lazy_vault=True)
+
+        with pytest.raises(VaultFileOpenError):
+            esf.get_server('srv1')
+
+        with pytest.raises(VaultFileOpenError):
+            esf.is_vault_file_encrypted()
+
+    with easy_server_file(
+            TEST_SERVER_FILENAME, server_yaml, TEST_VAULT_FILENAME,
+            vault_yaml, 'mypassword') as server_filepath:
+
+        # Testing for encryption does not load the encrypted vault file, so
+        # it does not need the password
+        esf = ServerFile(server_filepath, lazy_vault=True, use_keyring=False,
+                         use_prompting=False)
+        assert esf.is_vault_file_encrypted() is True
+
+
 TESTCASES_SF_IS_VAULT_FILE_ENCRYPTED = [
 
     # Testcases for ServerFile.is_vault_file_encrypted()
@@ -1044,6 +1396,21 @@ TESTCASES_SF_IS_VAULT_FILE_ENCRYPTED = [
         ),
         None, None, True
     ),
+    (
+        "Empty vault file name",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="vault_file: ''\n"
+                        "servers:\n"
+                        "  srv1:\n"
+                        "    description: server1\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            exp_encrypted=None,
+        ),
+        None, None, True
+    ),
     (
         "Decrypted vault file, no password",
         dict(
@@ -1349,6 +1716,12 @@ def test_ServerFile_get_server(
         for name in exp_server_attrs:
             assert getattr(act_srv, name) == exp_server_attrs[name]
 
+        # Verify that the secrets of the returned server are a copy
+        if act_srv.secrets is not None:
+            act_srv.secrets['foo'] = 'changed'
+            act_srv2 = esf.get_server(nick)
+            assert act_srv2.secrets == exp_server_attrs['secrets']
+
 
 TESTCASES_SF_LIST_SERVERS = [
 
@@ -1620,6 +1993,69 @@ TESTCASES_SF_LIST_SERVERS = [
         ),
         None, None, True
     ),
+    (
+        "Two server groups that are members of each other",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers:\n"
+                        "  srv1:\n"
+                        "    description: server1\n"
+                        "  srv2:\n"
+                        "    description: server2\n"
+                        "server_groups:\n"
+                        "  grp1:\n"
+                        "    description: group1\n"
+                        "    members:\n"
+                        "      - srv1\n"
+                        "      - grp2\n"
+                        "  grp2:\n"
+                        "    description: group2\n"
+                        "    members:\n"
+                        "      - srv2\n"
+                        "      - grp1\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            nick='grp1',
+            exp_servers_attrs=None,
+        ),
+        (ServerFileFormatError, "Server group 'grp1' is a member of itself"),
+        None, True
+    ),
+    (
+        "Server group with a member that is both a server and a server group",
+        dict(
+            server_filename=TEST_SERVER_FILENAME,
+            server_yaml="servers:\n"
+                        "  x:\n"
+                        "    description: serverx\n"
+                        "  y:\n"
+                        "    description: servery\n"
+                        "server_groups:\n"
+                        "  x:\n"
+                        "    description: groupx\n"
+                        "    members:\n"
+                        "      - y\n"
+                        "  g:\n"
+                        "    description: groupg\n"
+                        "    members:\n"
+                        "      - x\n",
+            vault_filename=None,
+            vault_yaml=None,
+            vault_password=None,
+            nick='g',
+            exp_servers_attrs=[
+                dict(
+                    nickname='x',
+                    description='serverx',
+                    contact_name=None,
+                    access_via=None,
+                    user_defined=None,
+                ),
+            ],
+        ),
+        None, None, True
+    ),
 ]
 
 
@@ -2088,3 +2524,41 @@ def test_ServerFile_list_all_servers(
             act_sd = sorted_act_sds[i]
             for name in exp_server_attrs:
                 assert getattr(act_sd, name) == exp_server_attrs[name]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_SF_LIST_ALL_SERVERS)
+@simplified_test_function
+def test_ServerFile_iter_all_servers(
+        testcase, server_filename, server_yaml, vault_filename, vault_yaml,
+        vault_password, exp_servers_attrs):
+    """
+    Test function for ServerFile.iter_all_servers()
+    """
+
+    with easy_server_file(
+            server_filename, server_yaml, vault_filename, vault_yaml,
+            vault_password) as server_filepath:
+
+        esf = ServerFile(server_filepath, vault_password, use_keyring=False,
+                         use_prompting=False)
+
+        # The code to be tested
+        act_sds = list(esf.iter_all_servers())
+
+        # Ensure that exceptions raised in the remainder of this function
+        # are not mistaken as expected exceptions
+        assert testcase.exp_exc_types is None, \
+            "Expected exception not raised: {}". \
+            format(testcase.exp_exc_types)
+
+        assert len(exp_servers_attrs) == len(act_sds)
+
+        sorted_exp_servers_attrs = sorted(
+            exp_servers_attrs, key=lambda x: x['nickname'])
+        sorted_act_sds = sorted(act_sds, key=lambda x: x.nickname)
+        for i, exp_server_attrs in enumerate(sorted_exp_servers_attrs):
+            act_sd = sorted_act_sds[i]
+            for name in exp_server_attrs:
+                assert getattr(act_sd, name) == exp_server_attrs[name]
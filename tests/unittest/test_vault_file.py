@@ -23,6 +23,7 @@ import easy_vault
 from easy_server import VaultFile, VaultFileFormatError, VaultFileOpenError, \
     VaultFileServerFormatError, VaultFileServerSchemaError
 # White box testing: We test an internal function
+from easy_server import _vault_file
 from easy_server._vault_file import _load_vault_file
 
 from ..utils.simplified_test_function import simplified_test_function
@@ -367,6 +368,36 @@ TESTCASES_VAULTFILE_LOAD = [
          "42 is not of type 'string'"),
         None, True
     ),
+    (
+        "Invalid file with one item that has two errors as per schema",
+        dict(
+            vault_yaml="secrets:\n"
+                       "  srv1:\n"
+                       "    nested:\n"
+                       "      bar: 42\n",
+            password=None,
+            server_schema={
+                "$schema": "http://json-schema.org/draft-07/schema#",
+                "type": "object",
+                "properties": {
+                    "nested": {
+                        "type": "object",
+                        "properties": {
+                            "bar": {"type": "string"},
+                        },
+                    },
+                },
+                "required": ["foo"],
+            },
+            exp_data=None,
+            exp_encrypted=None,
+        ),
+        (VaultFileServerFormatError,
+         "Invalid format in server item for server srv1.*"
+         "Validation failed on top-level of server item.*"
+         "'foo' is a required property"),
+        None, True
+    ),
     (
         "File with one item and invalid JSON schema",
         dict(
@@ -437,6 +468,38 @@ def test_VaultFile_load(
         assert act_encrypted == exp_encrypted
 
 
+def test_VaultFile_load_without_fastjsonschema(monkeypatch):
+    """
+    Test function for loading vault files when the fastjsonschema package is
+    not installed, so that only jsonschema is used for validation.
+    """
+
+    monkeypatch.setattr(_vault_file, '_VAULT_FILE_FAST_VALIDATE', False)
+
+    with TempDirectory() as tmp_dir:
+
+        filename = 'tmp_vault.yml'
+        filepath = os.path.join(tmp_dir.path, filename)
+
+        tmp_dir.write(filename, b"secrets:\n"
+                                b"  srv1:\n"
+                                b"    foo: bar\n")
+        act_data, act_encrypted = _load_vault_file(
+            filepath, None, use_keyring=False, use_prompting=False,
+            verbose=False)
+        assert act_data == {'secrets': {'srv1': {'foo': 'bar'}}}
+        assert act_encrypted is False
+
+        tmp_dir.write(filename, b"secrets:\n"
+                                b"  srv-1: {}\n")
+        with pytest.raises(VaultFileFormatError) as exc_info:
+            _load_vault_file(
+                filepath, None, use_keyring=False, use_prompting=False,
+                verbose=False)
+        assert "Validation failed on element 'secrets'" in \
+            str(exc_info.value)
+
+
 TESTCASES_VAULTFILE_GET_SECRETS = [
 
     # Testcases for VaultFile.get_secrets()
@@ -503,6 +566,25 @@ TESTCASES_VAULTFILE_GET_SECRETS = [
         None,
         None, True
     ),
+    (
+        "One secret with nested values; existing nickname",
+        dict(
+            vault_yaml="secrets:\n"
+                       "  srv1:\n"
+                       "    foo: bar\n"
+                       "    list: [a, b]\n"
+                       "    dict:\n"
+                       "      x: y\n",
+            nick='srv1',
+            exp_secrets={
+                'foo': 'bar',
+                'list': ['a', 'b'],
+                'dict': {'x': 'y'},
+            },
+        ),
+        None,
+        None, True
+    ),
 ]
 
 
@@ -538,6 +620,98 @@ def test_VaultFile_get_secrets(testcase, vault_yaml, nick, exp_secrets):
         for name in exp_secrets:
             assert act_secrets[name] == exp_secrets[name]
 
+        # Verify that the returned secrets item is a copy
+        for value in act_secrets.values():
+            if isinstance(value, list):
+                del value[:]
+            elif isinstance(value, dict):
+                value.clear()
+        act_secrets['new'] = 'value'
+        assert vf.get_secrets(nick) == exp_secrets
+
+
+TESTCASES_VAULTFILE_HAS_SECRETS = [
+
+    # Testcases for VaultFile.has_secrets()
+
+    # Each list item is a testcase tuple with these items:
+    # * desc: Short testcase description.
+    # * kwargs: Keyword arguments for the test function:
+    #   * vault_yaml: Content of vault file.
+    #   * nick: nickname input parameter for has_secrets().
+    #   * exp_result: Expected result of has_secrets().
+    # * exp_exc_types: Expected exception type(s), or None.
+    # * exp_warn_types: Expected warning type(s), or None.
+    # * condition: Boolean condition for testcase to run, or 'pdb' for debugger
+
+    (
+        "No secrets; non-existing nickname",
+        dict(
+            vault_yaml="secrets: {}\n",
+            nick='srv',
+            exp_result=False,
+        ),
+        None,
+        None, True
+    ),
+    (
+        "One secret; non-existing nickname",
+        dict(
+            vault_yaml="secrets:\n"
+                       "  srv1:\n"
+                       "    foo: bar\n",
+            nick='srv',
+            exp_result=False,
+        ),
+        None,
+        None, True
+    ),
+    (
+        "One secret; existing nickname",
+        dict(
+            vault_yaml="secrets:\n"
+                       "  srv1:\n"
+                       "    foo: bar\n",
+            nick='srv1',
+            exp_result=True,
+        ),
+        None,
+        None, True
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "desc, kwargs, exp_exc_types, exp_warn_types, condition",
+    TESTCASES_VAULTFILE_HAS_SECRETS)
+@simplified_test_function
+def test_VaultFile_has_secrets(testcase, vault_yaml, nick, exp_result):
+    """
+    Test function for VaultFile.has_secrets()
+    """
+
+    with TempDirectory() as tmp_dir:
+
+        # Create the server file
+        filename = 'tmp_vault.yaml'
+        filepath = os.path.join(tmp_dir.path, filename)
+        if isinstance(vault_yaml, six.text_type):
+            vault_yaml = vault_yaml.encode('utf-8')
+        tmp_dir.write(filename, vault_yaml)
+
+        vf = VaultFile(filepath)
+
+        # The code to be tested
+        act_result = vf.has_secrets(nick)
+
+        # Ensure that exceptions raised in the remainder of this function
+        # are not mistaken as expected exceptions
+        assert testcase.exp_exc_types is None, \
+            "Expected exception not raised: {}". \
+            format(testcase.exp_exc_types)
+
+        assert act_result == exp_result
+
 
 TESTCASES_VAULTFILE_NICKNAMES = [
 